@@ -15,9 +15,10 @@ import uuid
 
 from fastapi import APIRouter, HTTPException, Response, status
 
-from config import TOTAL_ESTIMATED_TIME, logger
+from config import TOTAL_ESTIMATED_TIME, VALIDATE_INTERNAL_RESPONSES, logger
 from core.worker import worker_process
 from schemas import GenerateRequest, GPUMetric, StatusResponse, SystemMetrics
+from schemas import structs
 from utils import get_system_metrics
 
 router = APIRouter()
@@ -196,30 +197,49 @@ async def get_status(job_id: str):
 
     # 실시간 시스템 메트릭 가져오기
     current_metrics = get_system_metrics()
-    system_metrics_model = SystemMetrics(
+
+    # 두 직렬화 경로(msgspec / Pydantic)가 공유하는 응답 필드
+    fields = {
+        "job_id": job_id,
+        "status": state["status"],
+        "progress_percent": state["progress_percent"],
+        "current_step": state["current_step"],
+        "sub_step": state.get("sub_step"),
+        "message": state["message"],
+        "elapsed_sec": round(elapsed, 1),
+        "eta_seconds": eta_seconds,
+        "step_eta_seconds": step_eta_seconds,
+        "system_metrics": current_metrics,
+        "parameters": state.get("parameters", {}),
+        "step1_result": images_snapshot.get("step1_result"),
+        "step2_result": images_snapshot.get("step2_result"),
+        "final_result": images_snapshot.get("final_result"),
+    }
+
+    # 폴링 빈도가 높은 엔드포인트 -> msgspec으로 바로 인코딩 (Pydantic 검증/직렬화 생략)
+    # StatusResponse와의 출력 일치는 tests/units/test_status_schema.py에서 검증
+    if structs.MSGSPEC_AVAILABLE and not VALIDATE_INTERNAL_RESPONSES:
+        return Response(
+            content=structs.encode_json(structs.build_status_struct(fields)),
+            media_type="application/json",
+        )
+
+    # 서버가 조립한 신뢰 가능한 값 -> 기본은 model_construct로 (중첩 포함) 재검증 생략
+    if VALIDATE_INTERNAL_RESPONSES:
+        build_gpu, build_metrics, build_status = GPUMetric, SystemMetrics, StatusResponse
+    else:
+        build_gpu = GPUMetric.model_construct
+        build_metrics = SystemMetrics.model_construct
+        build_status = StatusResponse.model_construct
+
+    fields["system_metrics"] = build_metrics(
         cpu_percent=current_metrics["cpu_percent"],
         ram_used_gb=current_metrics["ram_used_gb"],
         ram_total_gb=current_metrics["ram_total_gb"],
         ram_percent=current_metrics["ram_percent"],
-        gpu_info=[GPUMetric(**gpu) for gpu in current_metrics["gpu_info"]],
-    )
-
-    return StatusResponse(
-        job_id=job_id,
-        status=state["status"],
-        progress_percent=state["progress_percent"],
-        current_step=state["current_step"],
-        sub_step=state.get("sub_step"),
-        message=state["message"],
-        elapsed_sec=round(elapsed, 1),
-        eta_seconds=eta_seconds,
-        step_eta_seconds=step_eta_seconds,
-        system_metrics=system_metrics_model,
-        parameters=state.get("parameters", {}),
-        step1_result=images_snapshot.get("step1_result"),
-        step2_result=images_snapshot.get("step2_result"),
-        final_result=images_snapshot.get("final_result"),
+        gpu_info=[build_gpu(**gpu) for gpu in current_metrics["gpu_info"]],
     )
+    return build_status(**fields)
 
 
 @router.post(
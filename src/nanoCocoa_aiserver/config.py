@@ -43,6 +43,13 @@ TOTAL_ESTIMATED_TIME = sum(ESTIMATED_TIMES.values())
 
 # 메모리 관리 설정
 AUTO_UNLOAD_DEFAULT = True  # 기본값: 각 단계 완료 후 모델 언로드
+# 저VRAM 모드: SDXL 파이프라인을 model CPU offload로 실행 (torch.compile 비활성)
+# VAE slicing/tiling은 모드와 무관하게 항상 적용 - diffusers 0.36부터 pipe.enable_vae_*() 래퍼가
+# deprecated 되었으므로 각 파이프라인에서 pipe.vae.enable_slicing()/enable_tiling()을 직접 호출
+SDXL_LOW_VRAM = os.getenv("SDXL_LOW_VRAM", "0") == "1"
+
+# 서버 내부에서 조립하는 응답 모델 검증 여부 (QA 빌드에서 1로 설정, 기본은 model_construct로 생략)
+VALIDATE_INTERNAL_RESPONSES = os.getenv("VALIDATE_INTERNAL_RESPONSES", "0") == "1"
 
 # 로깅 설정
 logger = get_auto_logger()
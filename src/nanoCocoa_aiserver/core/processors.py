@@ -461,12 +461,13 @@ def process_step3_composite(
         engine.unload_step1_models()
         engine.unload_step2_models()
 
-    # Step 3 시작 전 강제 GPU 메모리 동기화 및 정리
-    torch.cuda.synchronize()  # GPU 작업 완료 대기
-    gc.collect()
-    torch.cuda.empty_cache()
-    if hasattr(torch.cuda, "ipc_collect"):
-        torch.cuda.ipc_collect()  # IPC 메모리 정리
+        # 언로드 직후에만 강제 GPU 메모리 동기화 및 정리
+        # (모델 유지 시 empty_cache는 다음 forward의 cudaMalloc 재호출만 유발)
+        torch.cuda.synchronize()  # GPU 작업 완료 대기
+        gc.collect()
+        torch.cuda.empty_cache()
+        if hasattr(torch.cuda, "ipc_collect"):
+            torch.cuda.ipc_collect()  # IPC 메모리 정리
 
     if not step1_result:
         raise ValueError("[Step 3 Error] Missing 'step1_result'. Cannot composite.")
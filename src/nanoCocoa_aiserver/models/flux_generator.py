@@ -184,10 +184,11 @@ class FluxGenerator:
         # 캐싱된 파이프라인 사용
         callback_fn(None, 0, None, None)
 
-        # 메모리 정리 후 파이프라인 로딩
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-        gc.collect()
+        # 최초 로딩 시에만 메모리 정리 (캐싱된 파이프라인 재사용 시 allocator 캐시 유지)
+        if self.t2i_pipe is None:
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+            gc.collect()
 
         pipe = self._load_t2i_pipeline()
 
@@ -6,10 +6,11 @@ sys.path.insert(0, str(project_root))
 
 import torch
 from diffusers import StableDiffusionXLPipeline
+from diffusers.models.attention_processor import AttnProcessor2_0
 from helper_dev_utils import get_auto_logger
 from PIL import Image
 
-from config import DEVICE, MODEL_IDS, TORCH_DTYPE
+from config import DEVICE, MODEL_IDS, SDXL_LOW_VRAM, TORCH_DTYPE
 from services.monitor import log_gpu_memory
 from utils import flush_gpu
 
@@ -38,14 +39,23 @@ class SDXLBaseGenerator:
         self.pipeline = StableDiffusionXLPipeline.from_pretrained(
             MODEL_IDS["SDXL_BASE"],
             torch_dtype=TORCH_DTYPE,
-        ).to(DEVICE)
-
-        # self.pipeline.enable_model_cpu_offload()
-        # self.pipeline.enable_attention_slicing()
-        # if hasattr(self.pipeline, "vae") and hasattr(
-        #     self.pipeline.vae, "enable_slicing"
-        # ):
-        #     self.pipeline.vae.enable_slicing()
+        )
+        if SDXL_LOW_VRAM:
+            # 모듈 단위로 필요할 때만 GPU에 올림 (피크 VRAM 최소화)
+            self.pipeline.enable_model_cpu_offload()
+        else:
+            self.pipeline.to(DEVICE)
+
+        # PyTorch SDPA attention (Flash/Mem-efficient 커널) + channels_last conv
+        self.pipeline.unet.set_attn_processor(AttnProcessor2_0())
+        self.pipeline.vae.set_attn_processor(AttnProcessor2_0())
+        if DEVICE == "cuda":
+            self.pipeline.unet.to(memory_format=torch.channels_last)
+            self.pipeline.vae.to(memory_format=torch.channels_last)
+
+        # Playground v2.5 1024x1024 출력 decode 피크 메모리 절감
+        self.pipeline.vae.enable_slicing()
+        self.pipeline.vae.enable_tiling()
 
         logger.info("[SDXLBaseGenerator] Playground v2.5 pipeline ready")
         return self.pipeline
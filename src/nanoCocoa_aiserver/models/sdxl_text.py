@@ -1,31 +1,145 @@
+import os
 import sys
+import threading
 from pathlib import Path
 
-project_root = Path(__file__).resolve().parents
+project_root = Path(__file__).resolve().parent
 sys.path.insert(0, str(project_root))
 
 import torch
 from diffusers import (
     AutoencoderKL,
+    BitsAndBytesConfig,
     ControlNetModel,
     StableDiffusionXLControlNetPipeline,
+    UNet2DConditionModel,
 )
+from diffusers.models.attention_processor import AttnProcessor2_0
 from PIL import Image
 from services.monitor import log_gpu_memory
 from utils import flush_gpu
 
-from config import DEVICE, MODEL_IDS, TORCH_DTYPE
+from config import DEVICE, MODEL_IDS, SDXL_LOW_VRAM, TORCH_DTYPE
 
 from helper_dev_utils import get_auto_logger
 
 logger = get_auto_logger()
 
+# U-Net/ControlNet NF4(bitsandbytes 4bit) 양자화 - 8~12GB GPU 배포용 (기본 비활성)
+# VAE는 디코딩 품질 저하를 피하기 위해 양자화하지 않음
+QUANTIZE_NF4 = os.getenv("SDXL_TEXT_QUANTIZE", "0") == "1"
+
+# U-Net/ControlNet/VAE decode torch.compile (기본 비활성)
+# 컴파일/CUDA graph 캡처 비용은 파이프라인이 상주할 때만 회수되므로
+# 요청마다 unload하는 auto_unload 기본 설정에서는 켜지 않음
+USE_TORCH_COMPILE = os.getenv("SDXL_TEXT_TORCH_COMPILE", "0") == "1"
+
 
 class SDXLTextGenerator:
     """
     SDXL ControlNet을 사용하여 3D 텍스트 효과를 생성하는 클래스입니다.
+
+    파이프라인은 최초 호출 시 로드 후 unload() 전까지 재사용합니다.
     """
 
+    def __init__(self):
+        """파이프라인 인스턴스 초기화 (실제 로딩은 generate_text_effect 호출 시 수행)"""
+        self.pipeline = None
+        self._load_lock = threading.Lock()
+
+    def _load_pipeline(self):
+        """SDXL ControlNet 파이프라인 로딩 (SDXL_TEXT_TORCH_COMPILE=1이면 torch.compile 적용)"""
+        if self.pipeline is not None:
+            return self.pipeline
+
+        # 동시 호출 시 ~7GB 가중치를 중복 로딩하지 않도록 잠금
+        with self._load_lock:
+            if self.pipeline is None:
+                self.pipeline = self._build_pipeline()
+        return self.pipeline
+
+    def _build_pipeline(self):
+        """ControlNet/VAE/SDXL 파이프라인을 구성하고 attention/VAE/compile 최적화를 적용합니다."""
+        logger.debug("[Engine] Loading SDXL ControlNet... (SDXL ControlNet 로딩 중)")
+        flush_gpu()
+
+        quant_kwargs = {}
+        unet_kwargs = {}
+        if QUANTIZE_NF4:
+            logger.info("[Engine] U-Net/ControlNet NF4 양자화 로딩")
+            quant_kwargs["quantization_config"] = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=TORCH_DTYPE,
+            )
+            unet_kwargs["unet"] = UNet2DConditionModel.from_pretrained(
+                MODEL_IDS["SDXL_BASE"],
+                subfolder="unet",
+                torch_dtype=TORCH_DTYPE,
+                **quant_kwargs,
+            )
+
+        controlnet = ControlNetModel.from_pretrained(
+            MODEL_IDS["SDXL_CNET"],
+            torch_dtype=TORCH_DTYPE,
+            use_safetensors=True,
+            **quant_kwargs,
+        )
+        vae = AutoencoderKL.from_pretrained(
+            MODEL_IDS["SDXL_VAE"], torch_dtype=TORCH_DTYPE
+        )
+        pipe = StableDiffusionXLControlNetPipeline.from_pretrained(
+            MODEL_IDS["SDXL_BASE"],
+            controlnet=controlnet,
+            vae=vae,
+            torch_dtype=TORCH_DTYPE,
+            **unet_kwargs,
+        )
+        if SDXL_LOW_VRAM:
+            # 모듈 단위로 필요할 때만 GPU에 올림 (피크 VRAM 최소화)
+            pipe.enable_model_cpu_offload()
+        else:
+            pipe.to(DEVICE)
+
+        # 메모리 효율 attention (xformers -> PyTorch SDPA fallback)
+        try:
+            pipe.enable_xformers_memory_efficient_attention()
+        except Exception:
+            pipe.unet.set_attn_processor(AttnProcessor2_0())
+            pipe.controlnet.set_attn_processor(AttnProcessor2_0())
+            pipe.vae.set_attn_processor(AttnProcessor2_0())
+
+        # 텍스트 에셋 decode 피크 메모리 절감
+        pipe.vae.enable_slicing()
+        pipe.vae.enable_tiling()
+
+        if DEVICE == "cuda":
+            pipe.vae.to(memory_format=torch.channels_last)
+            # NF4 가중치 모듈은 레이아웃 변경/CUDA graph 대상에서 제외
+            if not QUANTIZE_NF4:
+                pipe.unet.to(memory_format=torch.channels_last)
+                pipe.controlnet.to(memory_format=torch.channels_last)
+
+        # CPU offload는 매 호출 모듈을 옮기므로 CUDA graph와 병행 불가 -> 저VRAM 모드는 compile 생략
+        if USE_TORCH_COMPILE and DEVICE == "cuda" and not SDXL_LOW_VRAM:
+            if not QUANTIZE_NF4:
+                # 배치 1 denoise 루프는 kernel launch 병목 -> CUDA graph (reduce-overhead)
+                # canny_map 크기가 같으면 컴파일 결과 재사용 (dynamic=False)
+                pipe.unet = torch.compile(
+                    pipe.unet, mode="reduce-overhead", fullgraph=False, dynamic=False
+                )
+                pipe.controlnet = torch.compile(
+                    pipe.controlnet,
+                    mode="reduce-overhead",
+                    fullgraph=False,
+                    dynamic=False,
+                )
+            pipe.vae.decode = torch.compile(
+                pipe.vae.decode, mode="reduce-overhead", fullgraph=False, dynamic=False
+            )
+
+        return pipe
+
     def generate_text_effect(
         self,
         canny_map: Image.Image,
@@ -54,8 +168,6 @@ class SDXLTextGenerator:
         else:
             logger.info("[SDXL] progress_callback 정상 전달됨")
 
-        logger.debug("[Engine] Loading SDXL ControlNet... (SDXL ControlNet 로딩 중)")
-
         num_steps = 30
 
         def callback_fn(pipe_obj, step_index, timestep, callback_kwargs):
@@ -68,26 +180,8 @@ class SDXLTextGenerator:
                 )
             return callback_kwargs
 
-        flush_gpu()
-
         callback_fn(None, 0, None, None)
-        controlnet = ControlNetModel.from_pretrained(
-            MODEL_IDS["SDXL_CNET"], torch_dtype=TORCH_DTYPE, use_safetensors=True
-        )
-
-        callback_fn(None, 0, None, None)
-        vae = AutoencoderKL.from_pretrained(
-            MODEL_IDS["SDXL_VAE"], torch_dtype=TORCH_DTYPE
-        )
-
-        callback_fn(None, 0, None, None)
-        pipe = StableDiffusionXLControlNetPipeline.from_pretrained(
-            MODEL_IDS["SDXL_BASE"],
-            controlnet=controlnet,
-            vae=vae,
-            torch_dtype=TORCH_DTYPE,
-        ).to(DEVICE)
-
+        pipe = self._load_pipeline()
         callback_fn(None, 0, None, None)
 
         # Generator 설정: seed가 None이면 진정한 랜덤, 아니면 고정
@@ -102,31 +196,35 @@ class SDXLTextGenerator:
         logger.info(f" [SDXL] prompt='{prompt}' ")
         logger.info(f" [SDXL] negative_prompt='{negative_prompt}' ")
 
-        generated_img = pipe(
-            prompt=prompt,
-            negative_prompt=negative_prompt,
-            image=canny_map,
-            controlnet_conditioning_scale=1.0,
-            num_inference_steps=num_steps,
-            generator=generator,
-            callback_on_step_end=callback_fn,
-        ).images[0]
+        # 파이프라인 기본 no_grad보다 가벼운 inference_mode (view/version 추적 생략)
+        with torch.inference_mode():
+            generated_img = pipe(
+                prompt=prompt,
+                negative_prompt=negative_prompt,
+                image=canny_map,
+                controlnet_conditioning_scale=1.0,
+                num_inference_steps=num_steps,
+                generator=generator,
+                callback_on_step_end=callback_fn,
+            ).images[0]
         logger.info("[SDXL] Inference 완료")
 
-        del pipe, controlnet, vae
-        flush_gpu()
         return generated_img
 
     def unload(self) -> None:
         """
         명시적으로 SDXL 모델 리소스를 정리합니다.
 
-        현재 SDXL은 generate_text_effect() 호출 시마다 로드/언로드하므로
-        별도 정리 작업이 불필요하지만, 인터페이스 통일을 위해 구현합니다.
+        캐싱된 파이프라인을 삭제하여 GPU 메모리를 해제합니다.
         """
 
-        log_gpu_memory("SDXLTextGenerator unload (no-op)")
+        log_gpu_memory("SDXLTextGenerator unload (before)")
+
+        if self.pipeline is not None:
+            del self.pipeline
+            self.pipeline = None
 
         flush_gpu()
+        log_gpu_memory("SDXLTextGenerator unload (after)")
 
         logger.info("SDXLTextGenerator unloaded")
@@ -8,17 +8,22 @@ GCP 환경 배포용 하이브리드 세그멘테이션 엔진
 - 튜닝된 파라미터(v5)를 그대로 유지하여 최적의 엣지 품질 보장
 """
 
+import contextlib
 import os
 import gc
 import logging
+import threading
 import traceback
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Optional, Tuple
 
 import torch
+import torch.nn.functional as F
 import numpy as np
 import cv2
-from PIL import Image, ImageFilter
+from PIL import Image
 
 # -----------------------------------------------------------------------------
 # 로깅 및 라이브러리 설정
@@ -40,9 +45,20 @@ except ImportError:
 # 설정 및 상수
 # -----------------------------------------------------------------------------
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+# GPU에서는 FP16으로 추론 (활성화 메모리/대역폭 절반, Tensor Core 사용)
+MODEL_DTYPE = torch.float16 if DEVICE == "cuda" else torch.float32
 
-# 사용자 튜닝 파라미터 (v5 값 유지)
-CFG = {
+# BiRefNet torch.compile (reduce-overhead) 사용 여부 - 최초 로드 시 수십 초 컴파일 비용 발생
+USE_TORCH_COMPILE = os.getenv("SEG_TORCH_COMPILE", "0") == "1"
+
+# 모델 입력 해상도 (고정 -> 컴파일 결과 재사용)
+INPUT_SIZE = 1024
+
+# 스레드별 CLAHE 객체 캐시
+_CLAHE_LOCAL = threading.local()
+
+# 사용자 튜닝 파라미터 (v5 값 유지, 읽기 전용 -> LUT/커널 캐시와 항상 일치)
+CFG = MappingProxyType({
     # 1) CLAHE: 대비가 낮은 경계선 강화
     "USE_CLAHE": True,
     "CLAHE_CLIP_LIMIT": 2.5,
@@ -63,76 +79,181 @@ CFG = {
     "MID_SOFTEN_ENABLE": True,
     "MID_RANGE": (60, 200),
     "MID_SOFTEN_GAIN": 0.92
-}
+})
 
 # -----------------------------------------------------------------------------
 # 유틸리티 함수
 # -----------------------------------------------------------------------------
+def _get_clahe() -> "cv2.CLAHE":
+    """CFG 기반 CLAHE 객체 (내부 버퍼를 가지므로 스레드별 1회 생성 후 재사용)"""
+    clahe = getattr(_CLAHE_LOCAL, "clahe", None)
+    if clahe is None:
+        clahe = cv2.createCLAHE(
+            clipLimit=float(CFG["CLAHE_CLIP_LIMIT"]),
+            tileGridSize=tuple(CFG["CLAHE_TILE_GRID"])
+        )
+        _CLAHE_LOCAL.clahe = clahe
+    return clahe
+
+
 def apply_clahe_rgb(img_pil: Image.Image) -> Image.Image:
     """
     CLAHE 적용: LAB 색상 공간에서 L 채널만 강조하여 색감 변화 없이 경계 강화
     """
-    img = np.array(img_pil)
+    img = np.asarray(img_pil)
     lab = cv2.cvtColor(img, cv2.COLOR_RGB2LAB)
 
-    l, a, b = cv2.split(lab)
-    clahe = cv2.createCLAHE(
-        clipLimit=float(CFG["CLAHE_CLIP_LIMIT"]),
-        tileGridSize=tuple(CFG["CLAHE_TILE_GRID"])
-    )
-    cl = clahe.apply(l)
-    merged = cv2.merge((cl, a, b))
-    merged = cv2.cvtColor(merged, cv2.COLOR_LAB2RGB)
+    # split/merge 없이 L 채널만 갱신 후 같은 버퍼에 RGB로 역변환
+    lab[..., 0] = _get_clahe().apply(lab[..., 0])
+    merged = cv2.cvtColor(lab, cv2.COLOR_LAB2RGB, dst=lab)
 
     return Image.fromarray(merged)
 
 
+@lru_cache(maxsize=8)
+def _ellipse_kernel(size: int) -> np.ndarray:
+    """모폴로지용 타원 커널 (크기별 캐싱)"""
+    return cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (size, size))
+
+
+@lru_cache(maxsize=8)
+def _mask_luts(
+    low: int, high: int, mid_lo: int, mid_hi: int, gain: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    클램프/중간값 소프트닝용 256 엔트리 LUT (uint8 마스크에 cv2.LUT 한 번으로 적용)
+    - 모폴로지가 두 단계 사이에 있으므로 LUT는 분리 유지
+    """
+    clamp = np.arange(256, dtype=np.uint8)
+    clamp[:low] = 0
+    clamp[high + 1:] = 255
+
+    soften = np.arange(256, dtype=np.uint8)
+    mid = np.arange(mid_lo + 1, mid_hi, dtype=np.float32)
+    soften[mid_lo + 1:mid_hi] = np.clip(mid * gain, 0, 255).astype(np.uint8)
+    return clamp, soften
+
+
+def _prime_postprocess_caches() -> None:
+    """CFG에만 의존하는 CLAHE 객체/모폴로지 커널/LUT 캐시 선생성"""
+    if CFG["USE_CLAHE"]:
+        _get_clahe()
+    for k in (int(CFG["MORPH_CLOSE_KERNEL"]), int(CFG["MORPH_DILATE_KERNEL"])):
+        if CFG["USE_MORPH"] and k > 1:
+            _ellipse_kernel(k)
+    lo, hi = CFG["MID_RANGE"]
+    _mask_luts(
+        int(CFG["ALPHA_LOW_CUT"]),
+        int(CFG["ALPHA_HIGH_CUT"]),
+        int(lo),
+        int(hi),
+        float(CFG["MID_SOFTEN_GAIN"]),
+    )
+
+
 def postprocess_mask_hybrid(out: torch.Tensor, size_wh: Tuple[int, int]) -> Image.Image:
     """
     하이브리드 마스크 후처리 (v5 로직)
     """
     W, H = size_wh
 
-    # 1. 원본 마스크 추출 (Sigmoid -> 0~255)
-    mask = torch.sigmoid(out)[0, 0].detach().cpu().numpy()
-    mask = (mask * 255.0).astype(np.uint8)
-
-    # 2. 리사이즈 (OpenCV Lanczos4 사용으로 엣지 보존)
-    mask = cv2.resize(mask, (W, H), interpolation=cv2.INTER_LANCZOS4)
+    # 1~2. Sigmoid -> 원본 해상도 bicubic 리사이즈 -> uint8 변환까지 디바이스에서 처리
+    # (최종 uint8 마스크만 1회 D2H 복사)
+    mask = torch.sigmoid(out[:, :1].detach().float())
+    mask = F.interpolate(
+        mask, size=(H, W), mode="bicubic", align_corners=False, antialias=True
+    )
+    mask = mask.clamp_(0, 1).mul_(255.0).to(torch.uint8)[0, 0].cpu().numpy()
+
+    lo, hi = CFG["MID_RANGE"]
+    clamp_lut, soften_lut = _mask_luts(
+        int(CFG["ALPHA_LOW_CUT"]),
+        int(CFG["ALPHA_HIGH_CUT"]),
+        int(lo),
+        int(hi),
+        float(CFG["MID_SOFTEN_GAIN"]),
+    )
 
     # 3. 클램프 (흐릿한 영역 제거)
-    low = int(CFG["ALPHA_LOW_CUT"])
-    high = int(CFG["ALPHA_HIGH_CUT"])
-    mask[mask < low] = 0
-    mask[mask > high] = 255
+    mask = cv2.LUT(mask, clamp_lut)
 
     # 4. 모폴로지 (구멍 메우기)
     if CFG["USE_MORPH"]:
         k_close = int(CFG["MORPH_CLOSE_KERNEL"])
         if k_close > 1:
-            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (k_close, k_close))
-            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+            cv2.morphologyEx(mask, cv2.MORPH_CLOSE, _ellipse_kernel(k_close), dst=mask)
 
         k_dilate = int(CFG["MORPH_DILATE_KERNEL"])
         if k_dilate >= 3:
-            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (k_dilate, k_dilate))
-            mask = cv2.dilate(mask, kernel, iterations=int(CFG["MORPH_DILATE_ITER"]))
+            cv2.dilate(
+                mask,
+                _ellipse_kernel(k_dilate),
+                dst=mask,
+                iterations=int(CFG["MORPH_DILATE_ITER"]),
+            )
 
     # 5. 중간값 부드럽게 처리
     if CFG["MID_SOFTEN_ENABLE"]:
-        lo, hi = CFG["MID_RANGE"]
-        mid = (mask > lo) & (mask < hi)
-        mask[mid] = np.clip(
-            mask[mid].astype(np.float32) * float(CFG["MID_SOFTEN_GAIN"]), 0, 255
-        ).astype(np.uint8)
-
-    # 6. 페더링 (최종 블러)
-    mask_pil = Image.fromarray(mask).convert("L")
+        mask = cv2.LUT(mask, soften_lut)
+
+    # 6. 페더링 (최종 블러, uint8 그대로 OpenCV SIMD 가우시안 적용)
     r = float(CFG["FINAL_FEATHER_RADIUS"])
     if r > 0:
-        mask_pil = mask_pil.filter(ImageFilter.GaussianBlur(radius=r))
+        ksize = max(3, int(2 * round(3 * r) + 1))
+        mask = cv2.GaussianBlur(
+            mask, (ksize, ksize), sigmaX=r, borderType=cv2.BORDER_REPLICATE
+        )
 
-    return mask_pil
+    return Image.fromarray(mask)
+
+
+# -----------------------------------------------------------------------------
+# 모델 레지스트리 (프로세스 공용)
+# -----------------------------------------------------------------------------
+_MODEL_REGISTRY = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_seg_model(repo: str):
+    """
+    세그멘테이션 모델을 프로세스당 1회만 로드하여 공유합니다.
+    (엔진 인스턴스가 여러 개여도 from_pretrained / remote code 실행은 1회)
+    """
+    model = _MODEL_REGISTRY.get(repo)
+    if model is not None:
+        return model
+
+    with _REGISTRY_LOCK:
+        if repo in _MODEL_REGISTRY:
+            return _MODEL_REGISTRY[repo]
+
+        logger.info(f"모델 로딩 중: {repo}")
+        model = AutoModelForImageSegmentation.from_pretrained(
+            repo, trust_remote_code=True
+        ).to(DEVICE, dtype=MODEL_DTYPE).eval()
+
+        if DEVICE == "cuda":
+            # HWC 입력을 permute한 텐서가 이미 NHWC stride이므로 가중치도 channels_last로 통일
+            model = model.to(memory_format=torch.channels_last)
+
+        if USE_TORCH_COMPILE and DEVICE == "cuda":
+            model = torch.compile(model, mode="reduce-overhead")
+            # 첫 사용자 요청이 컴파일 비용을 떠안지 않도록 로드 시점에 더미 forward 1회
+            # (실제 입력과 같은 channels_last stride -> 재컴파일 방지)
+            dummy = torch.zeros(
+                1, 3, INPUT_SIZE, INPUT_SIZE, device=DEVICE, dtype=MODEL_DTYPE
+            ).to(memory_format=torch.channels_last)
+            with torch.inference_mode():
+                model(dummy)
+
+        _MODEL_REGISTRY[repo] = model
+        return model
+
+
+def release_seg_models() -> None:
+    """레지스트리에 로드된 모든 세그멘테이션 모델 해제"""
+    with _REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
 
 
 class ProductSegmentationEngine:
@@ -140,30 +261,33 @@ class ProductSegmentationEngine:
     대시보드용 상품 누끼(Segmentation) 엔진 클래스
     """
     def __init__(self):
-        self._cache = {}
+        # 1024x1024 uint8 입력용 pinned 스테이징 버퍼 (H2D 비동기 복사, 최초 추론 시 할당)
+        self._staging = None
+        # CFG 고정값 기반 커널/CLAHE/LUT를 초기화 시점에 미리 생성 (첫 요청 지연 제거)
+        _prime_postprocess_caches()
         logger.info(f"Segmentation 엔진 초기화 완료 (Device: {DEVICE})")
 
     def unload(self):
         """GPU 메모리 정리"""
-        for k in list(self._cache.keys()):
-            del self._cache[k]
+        release_seg_models()
+        self._staging = None
         if DEVICE == "cuda":
             gc.collect()
             torch.cuda.empty_cache()
         logger.info("메모리 정리 완료 (Unload)")
 
     def _load_model(self, repo: str):
-        """모델 로드 및 캐싱"""
-        if repo in self._cache:
-            return self._cache[repo]
-
-        logger.info(f"모델 로딩 중: {repo}")
-        model = AutoModelForImageSegmentation.from_pretrained(
-            repo, trust_remote_code=True
-        ).to(DEVICE).eval()
-
-        self._cache[repo] = model
-        return model
+        """모델 로드 및 캐싱 (프로세스 공용 레지스트리 사용)"""
+        return get_seg_model(repo)
+
+    def _to_device(self, arr: np.ndarray) -> torch.Tensor:
+        """HWC uint8 배열을 재사용 pinned 버퍼를 거쳐 non_blocking으로 디바이스에 복사"""
+        if DEVICE != "cuda":
+            return torch.from_numpy(arr)
+        if self._staging is None or self._staging.shape != arr.shape:
+            self._staging = torch.empty(arr.shape, dtype=torch.uint8).pin_memory()
+        np.copyto(self._staging.numpy(), arr)
+        return self._staging.to(DEVICE, non_blocking=True)
 
     def _run_inference(self, img_pil: Image.Image, repo: str):
         """추론 실행 공통 함수"""
@@ -175,13 +299,23 @@ class ProductSegmentationEngine:
         else:
             img_input = img_pil
 
-        # 입력 전처리 (1024x1024 리사이즈)
-        x = img_input.resize((1024, 1024), Image.LANCZOS)
-        x = torch.from_numpy(np.array(x)).permute(2, 0, 1).float() / 255.0
-        x = x.unsqueeze(0).to(DEVICE)
-
-        # 추론
-        with torch.no_grad():
+        # 입력 전처리 (1024x1024 리사이즈, 축소는 INTER_AREA / 확대는 Lanczos4)
+        arr = np.asarray(img_input)
+        interp = (
+            cv2.INTER_AREA if max(img_input.size) > INPUT_SIZE else cv2.INTER_LANCZOS4
+        )
+        arr = cv2.resize(arr, (INPUT_SIZE, INPUT_SIZE), interpolation=interp)
+        # uint8 상태로 전송한 뒤 GPU에서 dtype 변환 및 정규화
+        x = self._to_device(arr).permute(2, 0, 1).unsqueeze(0)
+        x = x.to(MODEL_DTYPE).div_(255.0)
+
+        # 추론 (autocast는 CUDA fp16에서만 - CPU autocast는 float32 dtype을 지원하지 않음)
+        amp = (
+            torch.autocast("cuda", dtype=MODEL_DTYPE)
+            if DEVICE == "cuda"
+            else contextlib.nullcontext()
+        )
+        with torch.inference_mode(), amp:
             out = model(x)
 
         # 모델별 출력 형식 대응
@@ -191,6 +325,32 @@ class ProductSegmentationEngine:
             return out[-1]
         return out
 
+    def run(self, image: Image.Image) -> Tuple[Image.Image, Image.Image]:
+        """
+        PIL 이미지의 배경을 제거합니다. 모델은 unload() 호출 전까지 캐싱되어 재사용됩니다.
+
+        Args:
+            image (Image.Image): 입력 이미지
+
+        Returns:
+            Tuple[Image.Image, Image.Image]: (배경이 제거된 RGBA 이미지, L 마스크)
+        """
+        img = image if image.mode == "RGB" else image.convert("RGB")
+        W, H = img.size
+
+        # 모델 추론 (BiRefNet 우선 -> 실패 시 RMBG)
+        try:
+            out = self._run_inference(img, "ZhengPeng7/BiRefNet")
+        except Exception as e:
+            logger.warning(f"BiRefNet 실패, RMBG로 재시도: {e}")
+            out = self._run_inference(img, "briaai/RMBG-1.4")
+
+        # 마스크 후처리 및 배경 제거 적용 (RGBA)
+        mask = postprocess_mask_hybrid(out, (W, H))
+        fg = img.convert("RGBA")
+        fg.putalpha(mask)
+        return fg, mask
+
     def process(self, img_path: str, save_dir: Optional[str] = None) -> str:
         """
         이미지 경로를 받아 배경을 제거하고 저장된 경로를 반환합니다.
@@ -212,19 +372,8 @@ class ProductSegmentationEngine:
             W, H = img.size
             logger.info(f"누끼 처리 시작: {path_obj.name} ({W}x{H})")
 
-            # 2. 모델 추론 (BiRefNet 우선 -> 실패 시 RMBG)
-            try:
-                out = self._run_inference(img, "ZhengPeng7/BiRefNet")
-            except Exception as e:
-                logger.warning(f"BiRefNet 실패, RMBG로 재시도: {e}")
-                out = self._run_inference(img, "briaai/RMBG-1.4")
-
-            # 3. 마스크 후처리
-            mask = postprocess_mask_hybrid(out, (W, H))
-
-            # 4. 배경 제거 적용 (RGBA)
-            fg = img.convert("RGBA")
-            fg.putalpha(mask)
+            # 2~4. 추론 + 마스크 후처리 + 배경 제거
+            fg, _ = self.run(img)
 
             # 5. 저장
             if save_dir:
@@ -240,18 +389,34 @@ class ProductSegmentationEngine:
             
             fg.save(save_path)
             logger.info(f"누끼 저장 완료: {save_path}")
-            
-            # 메모리 정리
-            self.unload()
-            
+
+            # 모델은 캐싱 유지 (해제는 호출 측에서 unload())
             return str(save_path)
 
         except Exception as e:
             logger.error(f"세그멘테이션 처리 중 오류: {e}")
             traceback.print_exc()
-            self.unload()
+            # OOM일 때만 모델을 내려 VRAM 회복 (일반 오류는 캐시 유지)
+            if isinstance(e, torch.cuda.OutOfMemoryError):
+                self.unload()
             raise e
 
+    def process_batch(self, img_paths, save_dir: Optional[str] = None) -> list:
+        """
+        여러 이미지를 같은 모델로 연속 처리한 뒤 마지막에 한 번만 메모리를 정리합니다.
+
+        Args:
+            img_paths: 입력 이미지 경로 목록
+            save_dir (str, optional): 저장할 디렉토리 (기본값: outputs/fg_cut)
+
+        Returns:
+            list: 저장된 경로 목록
+        """
+        try:
+            return [self.process(str(p), save_dir) for p in img_paths]
+        finally:
+            self.unload()
+
 # -----------------------------------------------------------------------------
 # 실행 진입점 (테스트용)
 # -----------------------------------------------------------------------------
@@ -265,11 +430,10 @@ if __name__ == "__main__":
     else:
         engine = ProductSegmentationEngine()
         files = sorted(TEST_INPUT_DIR.glob("*.*"))
-        
-        for f in files:
-            if f.suffix.lower() in [".jpg", ".jpeg", ".png", ".webp"]:
-                result_path = engine.process(str(f), str(TEST_OUTPUT_DIR))
-                print(f"Processed: {result_path}")
+        targets = [f for f in files if f.suffix.lower() in [".jpg", ".jpeg", ".png", ".webp"]]
+
+        for result_path in engine.process_batch(targets, str(TEST_OUTPUT_DIR)):
+            print(f"Processed: {result_path}")
 
 # Backward compatibility alias
 SegmentationModel = ProductSegmentationEngine
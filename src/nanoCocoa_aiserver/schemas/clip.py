@@ -3,6 +3,8 @@ clip.py
 CLIP Score 관련 스키마 정의 (OpenAI CLIP + KoCLIP 지원)
 """
 
+from __future__ import annotations
+
 from typing import Literal
 
 from pydantic import BaseModel, Field
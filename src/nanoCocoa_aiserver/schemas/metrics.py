@@ -2,6 +2,9 @@
 metrics.py
 시스템 메트릭 스키마 정의
 """
+
+from __future__ import annotations
+
 from pydantic import BaseModel, Field
 
 
@@ -3,10 +3,15 @@ request.py
 요청 스키마 정의
 """
 
+from __future__ import annotations
+
 from typing import Optional
 
 from pydantic import BaseModel, ConfigDict, Field
 
+# Base64 이미지 필드 최대 길이 (약 24MB 원본) - 초과 시 디코딩 전에 422로 거부
+MAX_IMAGE_B64_LENGTH = 32 * 1024 * 1024
+
 
 class GenerateRequest(BaseModel):
     """
@@ -16,6 +21,10 @@ class GenerateRequest(BaseModel):
     """
 
     model_config = ConfigDict(
+        # 요청 수신 후 변경하지 않는 읽기 전용 스키마 (할당 재검증 없음)
+        extra="ignore",
+        frozen=True,
+        validate_assignment=False,
         json_schema_extra={
             "example": {
                 "start_step": 1,
@@ -84,6 +93,7 @@ class GenerateRequest(BaseModel):
     )
     product_image: Optional[str] = Field(
         None,
+        max_length=MAX_IMAGE_B64_LENGTH,
         title="입력 이미지 (Input Image)",
         description=(
             "**[Step 1 선택]** 없는 경우 배경만 생성합니다 (Base64 인코딩 문자열)."
@@ -132,6 +142,7 @@ class GenerateRequest(BaseModel):
     # Step 2 (텍스트 에셋) 입력
     step1_image: Optional[str] = Field(
         None,
+        max_length=MAX_IMAGE_B64_LENGTH,
         title="Step 1 결과 이미지 (Step 1 Output Image)",
         description=(
             "**[Step 2 이상 시작 시 필수]** 이전 단계(Step 1)에서 생성된, 상품이 합성된 배경 이미지 (Base64).\n"
@@ -167,6 +178,7 @@ class GenerateRequest(BaseModel):
     # Step 3 (최종 합성) 입력
     step2_image: Optional[str] = Field(
         None,
+        max_length=MAX_IMAGE_B64_LENGTH,
         title="Step 2 결과 이미지 (Step 2 Output Image)",
         description=(
             "**[Step 3 시작 시 필수]** 이전 단계(Step 2)에서 생성된 배경 제거된 3D 텍스트 이미지 (Base64).\n"
@@ -2,6 +2,9 @@
 response.py
 응답 스키마 정의
 """
+
+from __future__ import annotations
+
 from typing import Optional
 
 from pydantic import BaseModel, Field
@@ -0,0 +1,92 @@
+"""
+structs.py
+상태 조회(/status) 응답 직렬화용 msgspec Struct 정의
+
+OpenAPI 문서는 Pydantic 스키마(StatusResponse 등)를 그대로 사용하고,
+실제 응답 본문은 msgspec으로 바로 JSON 인코딩합니다. (msgspec 미설치 시 Pydantic 경로 사용)
+"""
+from typing import Optional
+
+try:
+    import msgspec
+
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    msgspec = None
+    MSGSPEC_AVAILABLE = False
+
+
+if MSGSPEC_AVAILABLE:
+
+    class GPUMetricStruct(msgspec.Struct, kw_only=True):
+        """GPU 메트릭 정보 (GPUMetric과 동일 필드)"""
+        index: int
+        name: str
+        gpu_util: int
+        vram_used_gb: float
+        vram_total_gb: float
+        vram_percent: float
+
+    class SystemMetricsStruct(msgspec.Struct, kw_only=True):
+        """시스템 메트릭 정보 (SystemMetrics와 동일 필드)"""
+        cpu_percent: float
+        ram_used_gb: float
+        ram_total_gb: float
+        ram_percent: float
+        gpu_info: list[GPUMetricStruct] = []
+
+    class StatusResponseStruct(msgspec.Struct, kw_only=True):
+        """작업 상태 응답 (StatusResponse와 동일 필드/순서)"""
+        job_id: str
+        status: str
+        progress_percent: int
+        current_step: str
+        sub_step: Optional[str] = None
+        message: str
+        elapsed_sec: float
+        eta_seconds: Optional[int] = None
+        step_eta_seconds: Optional[int] = None
+        system_metrics: Optional[SystemMetricsStruct] = None
+        parameters: dict = {}
+        step1_result: Optional[str] = None
+        step2_result: Optional[str] = None
+        final_result: Optional[str] = None
+
+    _encoder = msgspec.json.Encoder()
+
+
+def build_status_struct(fields: dict) -> "StatusResponseStruct":
+    """
+    get_status가 조립한 응답 필드(dict)로 StatusResponseStruct를 생성합니다.
+
+    Args:
+        fields (dict): StatusResponse 필드. system_metrics는 get_system_metrics()의 dict
+
+    Raises:
+        RuntimeError: msgspec이 설치되지 않은 경우
+    """
+    if not MSGSPEC_AVAILABLE:
+        raise RuntimeError("msgspec is not installed")
+
+    metrics = fields.get("system_metrics")
+    if metrics is not None:
+        metrics = SystemMetricsStruct(
+            cpu_percent=metrics["cpu_percent"],
+            ram_used_gb=metrics["ram_used_gb"],
+            ram_total_gb=metrics["ram_total_gb"],
+            ram_percent=metrics["ram_percent"],
+            gpu_info=[GPUMetricStruct(**gpu) for gpu in metrics.get("gpu_info", [])],
+        )
+    return StatusResponseStruct(**{**fields, "system_metrics": metrics})
+
+
+def encode_json(obj) -> bytes:
+    """
+    Struct를 JSON bytes로 인코딩합니다.
+
+    Raises:
+        RuntimeError: msgspec이 설치되지 않은 경우
+    """
+    if not MSGSPEC_AVAILABLE:
+        raise RuntimeError("msgspec is not installed")
+    return _encoder.encode(obj)
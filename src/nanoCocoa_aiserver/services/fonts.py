@@ -5,13 +5,15 @@
 """
 
 import os
+import re
 import sys
+from functools import lru_cache
 from pathlib import Path
 
 project_root = Path(__file__).resolve().parent
 sys.path.insert(0, str(project_root))
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Tuple
 from helper_dev_utils import get_auto_logger
 
 logger = get_auto_logger()
@@ -30,30 +32,79 @@ def get_fonts_dir() -> str:
     return os.path.join(parent_dir, "fonts")
 
 
+@lru_cache(maxsize=4)
+def _scan_fonts(fonts_dir: str) -> Tuple[str, ...]:
+    """fonts_dir 하위의 TTF/OTF 상대 경로를 정렬하여 반환합니다. (디렉토리별 1회 탐색)"""
+    if not os.path.exists(fonts_dir):
+        logger.warning(f"Fonts directory not found: {fonts_dir}")
+        return ()
+
+    font_files = list(_scan(fonts_dir, ""))
+    font_files.sort()
+    return tuple(font_files)
+
+
+_FONT_EXTENSIONS = frozenset((".ttf", ".otf"))
+
+
+def _scan(root: str, prefix: str) -> Iterator[str]:
+    """os.scandir 재귀 탐색으로 root 하위 폰트의 (fonts_dir 기준) 상대 경로를 생성합니다."""
+    try:
+        it = os.scandir(root)
+    except OSError:
+        # os.walk와 동일하게 읽을 수 없는 디렉토리는 건너뜀
+        return
+    with it:
+        for entry in it:
+            name = entry.name
+            if entry.is_dir():
+                # os.walk(followlinks=False)와 동일하게 심볼릭 링크 디렉토리는 내려가지 않음
+                if not entry.is_symlink():
+                    yield from _scan(entry.path, os.path.join(prefix, name))
+            elif os.path.splitext(name)[1].lower() in _FONT_EXTENSIONS:
+                yield os.path.join(prefix, name) if prefix else name
+
+
+@lru_cache(maxsize=4)
+def _font_index(fonts_dir: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    폰트 이름 -> 상대 경로 조회 테이블 (정확 일치용, 대소문자 무시용)
+
+    - 정확 일치: 상대 경로 > 파일명 (동일 파일명은 정렬 순서상 첫 번째 우선)
+    - 대소문자 무시: 위 키들의 소문자 버전
+    """
+    fonts = _scan_fonts(fonts_dir)
+    exact: Dict[str, str] = {}
+    for rel_path in fonts:
+        exact.setdefault(os.path.basename(rel_path), rel_path)
+    # 상대 경로 자체가 키인 경우가 파일명 검색보다 우선 (fonts_dir 직접 결합과 동일)
+    exact.update((rel_path, rel_path) for rel_path in fonts)
+
+    folded: Dict[str, str] = {}
+    for key, rel_path in exact.items():
+        folded.setdefault(key.lower(), rel_path)
+    return exact, folded
+
+
+def clear_font_cache() -> None:
+    """폰트 목록 캐시를 비웁니다. (폰트 파일 추가/삭제 후 재탐색용)"""
+    _scan_fonts.cache_clear()
+    _font_index.cache_clear()
+    _build_font_metadata.cache_clear()
+
+
 def get_available_fonts() -> List[str]:
     """
     사용 가능한 폰트 파일 이름 목록을 반환합니다.
-    하위 디렉토리까지 재귀적으로 검색합니다.
+    하위 디렉토리까지 재귀적으로 검색하며, 결과는 프로세스 내에서 캐싱됩니다.
+    (폰트 파일 변경 시 clear_font_cache() 호출)
 
     Returns:
         List[str]: 폰트 파일의 상대 경로 리스트
                    (예: '나눔고딕/NanumGothic.ttf')
     """
-    fonts_dir = get_fonts_dir()
-    if not os.path.exists(fonts_dir):
-        logger.warning(f"Fonts directory not found: {fonts_dir}")
-        return []
-
-    font_files = []
-    for root, _, files in os.walk(fonts_dir):
-        for file in files:
-            if file.lower().endswith((".ttf", ".otf")):
-                # fonts_dir로부터의 상대 경로 저장
-                full_path = os.path.join(root, file)
-                rel_path = os.path.relpath(full_path, fonts_dir)
-                font_files.append(rel_path)
+    return list(_scan_fonts(get_fonts_dir()))
 
-    return sorted(font_files)
 
 
 def get_font_path(font_name: str) -> str:
@@ -71,35 +122,41 @@ def get_font_path(font_name: str) -> str:
 
     Notes:
         Fallback 우선순위:
-        1. 요청된 font_name
-        2. font_name이 파일명만 포함한 경우 검색
-        3. NanumMyeongjo-YetHangul.ttf (기본 폰트)
-        4. 첫 번째 사용 가능한 폰트
+        1. 요청된 font_name (상대 경로/파일명, 캐시된 목록에서 조회)
+        2. 목록에 없는 경로는 파일 존재 여부 직접 확인
+        3. 대소문자 무시 일치
+        4. NanumMyeongjo-YetHangul.ttf (기본 폰트)
+        5. 첫 번째 사용 가능한 폰트
     """
     fonts_dir = get_fonts_dir()
-    # 입력받은 font_name이 절대경로일 수도 있고, 파일명만 있을 수도 있음
-    # 우선 fonts_dir와 결합하여 확인
-    font_path = os.path.join(fonts_dir, font_name)
+    available = get_available_fonts()
+    exact, folded = _font_index(fonts_dir) if available else ({}, {})
+
+    # 1) 상대 경로 또는 파일명 정확 일치 (stat 호출 없이 조회)
+    rel_path = exact.get(font_name)
+    if rel_path is not None:
+        return os.path.join(fonts_dir, rel_path)
 
-    if os.path.exists(font_path) and os.path.isfile(font_path):
+    # 2) 목록에 없는 경로 (절대경로, 캐싱 이후 추가된 파일 등)는 직접 확인
+    font_path = os.path.join(fonts_dir, font_name)
+    if os.path.isfile(font_path):
         return font_path
 
-    # 혹시 파일명만 넘어왔을 경우, 검색
-    available = get_available_fonts()
-    for rel_path in available:
-        if os.path.basename(rel_path) == font_name:
-            return os.path.join(fonts_dir, rel_path)
+    # 3) 대소문자만 다른 경우
+    rel_path = folded.get(font_name.lower())
+    if rel_path is not None:
+        return os.path.join(fonts_dir, rel_path)
 
     # 그래도 없으면 기본값 (NanumMyeongjo-YetHangul.ttf 우선 시도)
     yet_hangul = "NanumMyeongjo-YetHangul.ttf"
     if available:
         # 1순위: NanumMyeongjo-YetHangul.ttf 찾기
-        for rel_path in available:
-            if os.path.basename(rel_path) == yet_hangul:
-                logger.info(
-                    f"Font '{font_name}' not found. Using fallback '{yet_hangul}'."
-                )
-                return os.path.join(fonts_dir, rel_path)
+        rel_path = exact.get(yet_hangul)
+        if rel_path is not None:
+            logger.info(
+                f"Font '{font_name}' not found. Using fallback '{yet_hangul}'."
+            )
+            return os.path.join(fonts_dir, rel_path)
 
         # 2순위: 그냥 첫 번째 폰트
         logger.warning(
@@ -110,52 +167,40 @@ def get_font_path(font_name: str) -> str:
     raise FileNotFoundError("No fonts available in 'fonts' directory.")
 
 
-def get_font_metadata() -> List[Dict[str, Any]]:
-    """
-    폰트 메타데이터를 반환합니다.
-    각 폰트의 스타일, 용도, 특성 정보를 포함합니다.
-
-    Returns:
-        List[Dict]: 폰트 메타데이터 리스트
-            - name: 폰트 파일명
-            - style: 폰트 스타일 (gothic/serif/handwriting/mono)
-            - weight: 굵기 (light/regular/bold/extrabold/heavy)
-            - usage: 적합한 용도 리스트
-            - tone: 톤앤매너 (professional/casual/elegant/energetic)
-    """
-    fonts = get_available_fonts()
+# 폰트 파일명 분류 규칙 (우선순위 순서대로 검사, 카테고리별 단일 정규식)
+_STYLE_RULES = (
+    ("gothic", re.compile("gothic|고딕")),
+    ("serif", re.compile("myeongjo|myungjo|명조|serif|maru|마루")),
+    ("handwriting", re.compile("brush|pen|붓|펜|손글씨")),
+    ("mono", re.compile("coding|d2")),
+)
+_WEIGHT_RULES = (
+    ("heavy", re.compile("heavy|black")),
+    ("extrabold", re.compile("extrabold|eb")),
+    ("bold", re.compile(r"bold|b\.ttf")),
+    ("light", re.compile(r"light|l\.ttf|el")),
+)
+
+
+def _classify(lower_name: str, rules, default: str) -> str:
+    """rules 순서대로 처음 매칭되는 분류 반환"""
+    for label, pattern in rules:
+        if pattern.search(lower_name):
+            return label
+    return default
+
+
+@lru_cache(maxsize=1)
+def _build_font_metadata(fonts: Tuple[str, ...]) -> Tuple[Dict[str, Any], ...]:
+    """폰트 목록별 메타데이터 분류 결과 (목록이 바뀌지 않으면 재사용)"""
     metadata = []
 
     for font in fonts:
-        name = os.path.basename(font)
-        lower_name = name.lower()
-
-        # 스타일 분류
-        if any(k in lower_name for k in ["gothic", "고딕"]):
-            style = "gothic"
-        elif any(
-            k in lower_name
-            for k in ["myeongjo", "myungjo", "명조", "serif", "maru", "마루"]
-        ):
-            style = "serif"
-        elif any(k in lower_name for k in ["brush", "pen", "붓", "펜", "손글씨"]):
-            style = "handwriting"
-        elif "coding" in lower_name or "d2" in lower_name:
-            style = "mono"
-        else:
-            style = "sans-serif"
-
-        # 굵기 분류
-        if any(k in lower_name for k in ["heavy", "black"]):
-            weight = "heavy"
-        elif any(k in lower_name for k in ["extrabold", "eb"]):
-            weight = "extrabold"
-        elif any(k in lower_name for k in ["bold", "b.ttf"]):
-            weight = "bold"
-        elif any(k in lower_name for k in ["light", "l.ttf", "el"]):
-            weight = "light"
-        else:
-            weight = "regular"
+        lower_name = os.path.basename(font).lower()
+
+        # 스타일 / 굵기 분류
+        style = _classify(lower_name, _STYLE_RULES, "sans-serif")
+        weight = _classify(lower_name, _WEIGHT_RULES, "regular")
 
         # 용도 및 톤 분류
         usage = []
@@ -190,4 +235,26 @@ def get_font_metadata() -> List[Dict[str, Any]]:
             }
         )
 
-    return metadata
+    return tuple(metadata)
+
+
+def get_font_metadata() -> List[Dict[str, Any]]:
+    """
+    폰트 메타데이터를 반환합니다.
+    각 폰트의 스타일, 용도, 특성 정보를 포함합니다.
+    분류 결과는 폰트 목록이 바뀌기 전까지 캐싱됩니다.
+
+    Returns:
+        List[Dict]: 폰트 메타데이터 리스트
+            - name: 폰트 파일명
+            - style: 폰트 스타일 (gothic/serif/handwriting/mono)
+            - weight: 굵기 (light/regular/bold/extrabold/heavy)
+            - usage: 적합한 용도 리스트
+            - tone: 톤앤매너 (professional/casual/elegant/energetic)
+    """
+    cached = _build_font_metadata(tuple(get_available_fonts()))
+    # 호출 측 수정이 캐시에 반영되지 않도록 얕은 복사본 반환
+    return [
+        {**meta, "usage": list(meta["usage"]), "tone": list(meta["tone"])}
+        for meta in cached
+    ]
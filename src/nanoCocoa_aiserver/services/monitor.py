@@ -4,8 +4,10 @@
 CPU, RAM, GPU, VRAM 사용량을 추적하고 GPU 메모리를 정리합니다.
 """
 
+import atexit
 import gc
 import sys
+import threading
 from pathlib import Path
 
 import psutil
@@ -14,13 +16,47 @@ import torch
 project_root = Path(__file__).resolve().parent
 sys.path.insert(0, str(project_root))
 
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 import nvidia_smi as pynvml
 
 from helper_dev_utils import get_auto_logger
 
 logger = get_auto_logger()
 
+# NVML은 프로세스당 1회만 초기화하고 디바이스 핸들/이름을 재사용 (종료 시 atexit로 shutdown)
+_NVML_DEVICES: Optional[List[Tuple[Any, str]]] = None
+_NVML_LOCK = threading.Lock()
+
+# 전체 RAM은 고정값이므로 1회만 계산, cpu_percent는 첫 호출 0.0 방지를 위해 미리 기준점 설정
+_RAM_TOTAL_GB = round(psutil.virtual_memory().total / 1024**3, 2)
+psutil.cpu_percent(interval=None)
+
+
+def _nvml_devices() -> List[Tuple[Any, str]]:
+    """NVML 초기화 후 (핸들, GPU 이름) 목록을 반환합니다. 초기화 실패 시 빈 목록."""
+    global _NVML_DEVICES
+    if _NVML_DEVICES is not None:
+        return _NVML_DEVICES
+
+    with _NVML_LOCK:
+        if _NVML_DEVICES is not None:
+            return _NVML_DEVICES
+
+        devices = []
+        try:
+            pynvml.nvmlInit()
+            atexit.register(pynvml.nvmlShutdown)
+            for i in range(pynvml.nvmlDeviceGetCount()):
+                handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+                gpu_name = pynvml.nvmlDeviceGetName(handle)
+                if isinstance(gpu_name, bytes):
+                    gpu_name = gpu_name.decode("utf-8")
+                devices.append((handle, gpu_name))
+        except Exception as e:
+            logger.error(f"GPU Monitor Error (NVML 초기화 오류): {e}")
+        _NVML_DEVICES = devices
+    return _NVML_DEVICES
+
 
 def flush_gpu() -> None:
     """
@@ -76,21 +112,16 @@ def get_system_metrics() -> Dict[str, Any]:
                 - vram_total_gb (float): 전체 VRAM (GB)
                 - vram_percent (float): VRAM 사용률 (%)
     """
-    cpu_usage = psutil.cpu_percent()
+    cpu_usage = psutil.cpu_percent(interval=None)
     ram_info = psutil.virtual_memory()
 
     gpu_metrics = []
     try:
         if pynvml:
-            pynvml.nvmlInit()
-            device_count = pynvml.nvmlDeviceGetCount()
-            for i in range(device_count):
-                handle = pynvml.nvmlDeviceGetHandleByIndex(i)
+            for i, (handle, gpu_name) in enumerate(_nvml_devices()):
+                # 동적 값(메모리/사용률)만 매 호출 조회
                 mem_info = pynvml.nvmlDeviceGetMemoryInfo(handle)
                 util = pynvml.nvmlDeviceGetUtilizationRates(handle)
-                gpu_name = pynvml.nvmlDeviceGetName(handle)
-                if isinstance(gpu_name, bytes):
-                    gpu_name = gpu_name.decode("utf-8")
 
                 vram_used_gb = mem_info.used / 1024**3
                 vram_total_gb = mem_info.total / 1024**3
@@ -109,7 +140,6 @@ def get_system_metrics() -> Dict[str, Any]:
                         ),
                     }
                 )
-            pynvml.nvmlShutdown()
         else:
             logger.warning("pynvml 라이브러리를 사용할 수 없습니다.")
     except Exception as e:
@@ -119,12 +149,11 @@ def get_system_metrics() -> Dict[str, Any]:
         logger.error(traceback.format_exc())
 
     ram_used_gb = ram_info.used / 1024**3
-    ram_total_gb = ram_info.total / 1024**3
 
     return {
         "cpu_percent": cpu_usage,
         "ram_used_gb": round(ram_used_gb, 2),
-        "ram_total_gb": round(ram_total_gb, 2),
+        "ram_total_gb": _RAM_TOTAL_GB,
         "ram_percent": ram_info.percent,
         "gpu_info": gpu_metrics,
     }
@@ -13,8 +13,14 @@
 # Lazy import를 위한 __getattr__ 구현
 def __getattr__(name):
     # Image utilities
-    if name in ("pil_to_base64", "base64_to_pil", "pil_canny_edge"):
-        from utils.images import base64_to_pil, pil_canny_edge, pil_to_base64
+    if name in (
+        "pil_to_base64",
+        "base64_to_pil",
+        "base64_to_rgb_array",
+        "pil_canny_edge",
+    ):
+        from utils.images import (base64_to_pil, base64_to_rgb_array,
+                                  pil_canny_edge, pil_to_base64)
 
         return locals()[name]
     # System monitoring
@@ -41,6 +47,7 @@ __all__ = [
     # Image utilities
     "pil_to_base64",
     "base64_to_pil",
+    "base64_to_rgb_array",
     "pil_canny_edge",
     # System monitoring
     "flush_gpu",
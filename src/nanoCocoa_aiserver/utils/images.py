@@ -9,6 +9,8 @@ import binascii
 from io import BytesIO
 from typing import Optional
 
+import cv2
+import numpy as np
 from PIL import Image, ImageFilter
 
 
@@ -34,15 +36,34 @@ def pil_to_base64(image: Image.Image, format: str = "PNG") -> str:
     return base64.b64encode(buffered.getvalue()).decode("utf-8")
 
 
-def base64_to_pil(b64_str: str) -> Image.Image:
+def _open_rgb_bytes(img_bytes: bytes) -> np.ndarray:
     """
-    Base64 인코딩된 문자열을 PIL 이미지로 변환합니다.
+    인코딩된 이미지 바이트를 RGB uint8 배열로 디코딩합니다.
+
+    OpenCV(SIMD JPEG/PNG 디코더)를 우선 사용하고, 미지원 포맷은 PIL로 처리합니다.
+    PIL과 동일하게 EXIF 회전은 적용하지 않습니다.
+    """
+    arr = cv2.imdecode(
+        np.frombuffer(img_bytes, dtype=np.uint8),
+        cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION,
+    )
+    if arr is None:
+        img = Image.open(BytesIO(img_bytes))
+        # 이미지 로드 (실제 데이터 검증)
+        img.load()
+        return np.asarray(img.convert("RGB"))
+    return cv2.cvtColor(arr, cv2.COLOR_BGR2RGB)
+
+
+def base64_to_rgb_array(b64_str: str) -> np.ndarray:
+    """
+    Base64 인코딩된 문자열을 RGB uint8 배열 (H, W, 3)로 변환합니다.
 
     Args:
         b64_str (str): Base64 인코딩된 이미지 문자열
 
     Returns:
-        Image.Image: PIL 이미지 객체
+        np.ndarray: RGB 이미지 배열
 
     Raises:
         ValueError: 유효하지 않은 Base64 문자열인 경우
@@ -68,13 +89,7 @@ def base64_to_pil(b64_str: str) -> Image.Image:
         if len(img_bytes) < 100:
             raise ValueError(f"Decoded image too small: {len(img_bytes)} bytes")
 
-        # PIL 이미지로 변환
-        img = Image.open(BytesIO(img_bytes))
-
-        # 이미지 로드 (실제 데이터 검증)
-        img.load()
-
-        return img.convert("RGB")
+        return _open_rgb_bytes(img_bytes)
 
     except base64.binascii.Error as e:
         raise ValueError(f"Invalid Base64 encoding: {e}")
@@ -84,6 +99,22 @@ def base64_to_pil(b64_str: str) -> Image.Image:
         raise ValueError(f"Failed to decode Base64 image: {type(e).__name__}: {e}")
 
 
+def base64_to_pil(b64_str: str) -> Image.Image:
+    """
+    Base64 인코딩된 문자열을 PIL 이미지로 변환합니다.
+
+    Args:
+        b64_str (str): Base64 인코딩된 이미지 문자열
+
+    Returns:
+        Image.Image: PIL 이미지 객체 (RGB)
+
+    Raises:
+        ValueError: 유효하지 않은 Base64 문자열인 경우
+    """
+    return Image.fromarray(base64_to_rgb_array(b64_str))
+
+
 def pil_canny_edge(image: Image.Image, threshold: int = 30) -> Image.Image:
     """
     PIL 이미지를 입력받아 Canny Edge 처리된 이미지를 반환합니다.
@@ -118,7 +118,7 @@ def run_inference(img_pil: Image.Image, repo: str):
     x = torch.from_numpy(np.array(x)).permute(2, 0, 1).float() / 255.0
     x = x.unsqueeze(0).to(DEVICE)
 
-    with torch.no_grad():
+    with torch.inference_mode():
         out = model(x)
 
     # 출력 타입 대응
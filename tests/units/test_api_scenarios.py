@@ -259,6 +259,23 @@ def test_reset_argument_validation():
     pass
 
 
+def test_oversized_image_rejected():
+    """
+    Base64 이미지가 MAX_IMAGE_B64_LENGTH를 넘으면 디코딩/작업 생성 없이 422 반환
+    """
+    from schemas.request import MAX_IMAGE_B64_LENGTH
+
+    req_body = {
+        "start_step": 1,
+        "text_content": "Too Big",
+        "product_image": "A" * (MAX_IMAGE_B64_LENGTH + 1),
+    }
+    resp = client.post("/generate", json=req_body)
+    assert resp.status_code == 422
+    assert resp.json()["detail"][0]["loc"] == ["body", "product_image"]
+    assert len(JOBS) == 0
+
+
 def test_no_text_content_scenario():
     """
     Test 5: No Text Content Scenario (TEXT 없이 STEP1만 실행)
@@ -0,0 +1,116 @@
+"""
+SDXL 합성 엔진 CPU 보조 함수 회귀 테스트.
+
+NumPy/OpenCV로 재작성한 그림자 레이어, 알파 붙여넣기, 색상 팔레트가
+기존 PIL 구현과 같은 결과를 내는지 합성 이미지로 검증합니다.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+import sys
+from pathlib import Path
+
+# src/nanoCocoa_aiserver를 path에 추가
+sys.path.insert(0, str(Path(__file__).parents[2] / "src" / "nanoCocoa_aiserver"))
+
+pytest.importorskip("torch")
+cv2 = pytest.importorskip("cv2")
+
+from models.sdxl_generator import SAFEGUARDS, DashboardComposeEngine
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return DashboardComposeEngine()
+
+
+def _ellipse_mask(w: int = 200, h: int = 300) -> Image.Image:
+    """제품 실루엣 형태의 L 마스크"""
+    arr = np.zeros((h, w), dtype=np.uint8)
+    cv2.ellipse(arr, (w // 2, h // 2), (w // 3, h * 2 // 5), 0, 0, 360, 255, -1)
+    return Image.fromarray(arr)
+
+
+class TestMakeShadowLayer:
+    """그림자 레이어가 기존 PIL 구현과 일치"""
+
+    @staticmethod
+    def _reference(mask: Image.Image, size) -> np.ndarray:
+        shadow = mask.resize(size).filter(
+            ImageFilter.GaussianBlur(SAFEGUARDS["SHADOW_BLUR"])
+        )
+        layer = Image.new("RGBA", shadow.size, (0, 0, 0, 255))
+        layer.putalpha(shadow.point(lambda p: p * SAFEGUARDS["SHADOW_OPACITY"]))
+        return np.asarray(layer)
+
+    @pytest.mark.parametrize("size", [(200, 60), (200, 40), (120, 30), (600, 200)])
+    def test_matches_pil_reference(self, engine, size):
+        mask = _ellipse_mask()
+
+        result = engine._make_shadow_layer(mask, size)
+
+        assert result.shape == (size[1], size[0], 4)
+        assert result.dtype == np.uint8
+        np.testing.assert_array_equal(result, self._reference(mask, size))
+
+
+class TestAlphaPaste:
+    """NumPy 알파 블렌딩이 기존 RGBA paste 결과와 일치"""
+
+    @staticmethod
+    def _reference(bg: Image.Image, fg: Image.Image, pos) -> np.ndarray:
+        comp = bg.convert("RGBA")
+        comp.paste(fg, pos, fg)
+        return np.asarray(comp.convert("RGB"))
+
+    @pytest.mark.parametrize(
+        "pos",
+        [(20, 10), (0, 0), (100, 60), (-30, -20), (-30, 70), (200, 10), (10, -60)],
+        ids=["inside", "origin", "clip_br", "clip_tl", "clip_bl", "outside_x", "outside_y"],
+    )
+    def test_matches_pil_paste(self, engine, pos):
+        rng = np.random.default_rng(0)
+        bg = Image.fromarray(rng.integers(0, 256, (120, 160, 3), dtype=np.uint8))
+        fg = Image.fromarray(rng.integers(0, 256, (50, 80, 4), dtype=np.uint8))
+
+        dst = np.array(bg)
+        engine._alpha_paste(dst, np.asarray(fg), pos)
+
+        np.testing.assert_array_equal(dst, self._reference(bg, fg, pos))
+
+
+class TestExtractColorPalette:
+    """팔레트 문자열 형식과 빈도순 정렬"""
+
+    @staticmethod
+    def _striped(counts) -> Image.Image:
+        """색상별 행 수가 counts인 100x100 이미지"""
+        rows = [np.full((n, 100, 3), color, dtype=np.uint8) for color, n in counts]
+        return Image.fromarray(np.concatenate(rows))
+
+    def test_hex_format_and_order(self, engine):
+        img = self._striped([((0, 0, 255), 20), ((255, 0, 0), 50), ((0, 200, 16), 30)])
+
+        palette = engine.extract_color_palette(img)
+
+        # 4bit 양자화 bin 중심값, 소문자 #rrggbb, 빈도 내림차순
+        assert palette == "#f80808, #08c818, #0808f8"
+
+    def test_limits_to_k(self, engine):
+        colors = [(i * 40, 255 - i * 40, 128) for i in range(6)]
+        img = self._striped([(c, n) for c, n in zip(colors, (5, 30, 10, 25, 20, 10))])
+
+        palette = engine.extract_color_palette(img, k=3).split(", ")
+
+        assert len(palette) == 3
+        assert palette == [
+            "#%02x%02x%02x" % tuple((v >> 4) * 16 + 8 for v in colors[i])
+            for i in (1, 3, 4)
+        ]
+
+    def test_scales_input_before_counting(self, engine):
+        img = self._striped([((255, 0, 0), 60), ((0, 0, 255), 40)]).resize((640, 480))
+
+        assert engine.extract_color_palette(img) == "#f80808, #0808f8"
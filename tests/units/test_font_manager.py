@@ -15,7 +15,12 @@ from pathlib import Path
 # src/nanoCocoa_aiserver를 path에 추가
 sys.path.insert(0, str(Path(__file__).parents[2] / "src" / "nanoCocoa_aiserver"))
 
-from services.fonts import get_fonts_dir, get_available_fonts, get_font_path
+from services.fonts import (
+    clear_font_cache,
+    get_available_fonts,
+    get_font_path,
+    get_fonts_dir,
+)
 
 
 class TestGetFontsDir:
@@ -58,6 +63,46 @@ class TestGetAvailableFonts:
         
         assert result == []
 
+    def test_caches_until_clear_font_cache(self, monkeypatch, tmp_path):
+        """목록은 캐싱되며 clear_font_cache() 후 재탐색"""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "A.ttf").write_bytes(b"")
+        monkeypatch.setattr("services.fonts.get_fonts_dir", lambda: str(tmp_path))
+        clear_font_cache()
+
+        assert get_available_fonts() == [os.path.join("sub", "A.ttf")]
+
+        (tmp_path / "B.otf").write_bytes(b"")
+        assert get_available_fonts() == [os.path.join("sub", "A.ttf")]
+
+        clear_font_cache()
+        assert get_available_fonts() == ["B.otf", os.path.join("sub", "A.ttf")]
+        clear_font_cache()
+
+    def test_matches_extensions_case_insensitively(self, monkeypatch, tmp_path):
+        """확장자 대소문자와 무관하게 TTF/OTF만 포함"""
+        for name in ("Upper.TTF", "Mixed.Otf", "lower.ttf", "readme.txt", "ttf"):
+            (tmp_path / name).write_bytes(b"")
+        monkeypatch.setattr("services.fonts.get_fonts_dir", lambda: str(tmp_path))
+        clear_font_cache()
+
+        assert get_available_fonts() == ["Mixed.Otf", "Upper.TTF", "lower.ttf"]
+        clear_font_cache()
+
+    def test_does_not_follow_symlinked_dirs(self, monkeypatch, tmp_path):
+        """심볼릭 링크 디렉토리는 탐색하지 않음 (os.walk 기본 동작과 동일)"""
+        (tmp_path / "real").mkdir()
+        (tmp_path / "real" / "A.ttf").write_bytes(b"")
+        try:
+            os.symlink(tmp_path / "real", tmp_path / "link", target_is_directory=True)
+        except (OSError, NotImplementedError):
+            pytest.skip("Symlinks not supported on this platform")
+        monkeypatch.setattr("services.fonts.get_fonts_dir", lambda: str(tmp_path))
+        clear_font_cache()
+
+        assert get_available_fonts() == [os.path.join("real", "A.ttf")]
+        clear_font_cache()
+
 
 class TestGetFontPath:
     """get_font_path 함수 테스트"""
@@ -76,6 +121,48 @@ class TestGetFontPath:
         assert os.path.exists(result)
         assert os.path.isfile(result)
     
+    def test_resolves_basename_only(self):
+        """파일명만 전달해도 하위 디렉토리의 폰트 경로 반환"""
+        available = get_available_fonts()
+        
+        if not available:
+            pytest.skip("No fonts available for testing")
+        
+        rel_path = available[0]
+        result = get_font_path(os.path.basename(rel_path))
+        
+        assert result == os.path.join(get_fonts_dir(), rel_path)
+    
+    def test_relative_path_wins_over_basename(self, monkeypatch, tmp_path):
+        """상대 경로 키가 하위 디렉토리의 동일 파일명보다 우선"""
+        (tmp_path / "A").mkdir()
+        (tmp_path / "A" / "Z.ttf").write_bytes(b"")
+        (tmp_path / "Z.ttf").write_bytes(b"")
+        monkeypatch.setattr("services.fonts.get_fonts_dir", lambda: str(tmp_path))
+        clear_font_cache()
+
+        assert get_font_path("Z.ttf") == os.path.join(str(tmp_path), "Z.ttf")
+        assert get_font_path("z.TTF") == os.path.join(str(tmp_path), "Z.ttf")
+        assert get_font_path(os.path.join("A", "Z.ttf")) == os.path.join(
+            str(tmp_path), "A", "Z.ttf"
+        )
+        clear_font_cache()
+
+    def test_resolves_case_insensitively(self, monkeypatch, tmp_path):
+        """대소문자만 다른 상대 경로/파일명도 실제 폰트 경로로 해석"""
+        (tmp_path / "sub").mkdir()
+        (tmp_path / "sub" / "Foo.OTF").write_bytes(b"")
+        (tmp_path / "Bar.ttf").write_bytes(b"")
+        monkeypatch.setattr("services.fonts.get_fonts_dir", lambda: str(tmp_path))
+        clear_font_cache()
+        expected = str(tmp_path / "sub" / "Foo.OTF")
+
+        for name in ("foo.otf", "FOO.OTF", os.path.join("SUB", "foo.otf")):
+            result = get_font_path(name)
+            # 대소문자 무시 파일시스템에서는 요청한 표기 그대로 반환될 수 있음
+            assert os.path.samefile(result, expected)
+        clear_font_cache()
+
     def test_fallback_to_yet_hangul(self):
         """존재하지 않는 폰트 요청 시 NanumMyeongjo-YetHangul.ttf로 Fallback"""
         available = get_available_fonts()
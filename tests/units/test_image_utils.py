@@ -15,7 +15,12 @@ from pathlib import Path
 # src/nanoCocoa_aiserver를 path에 추가
 sys.path.insert(0, str(Path(__file__).parents[2] / "src" / "nanoCocoa_aiserver"))
 
-from utils.images import pil_to_base64, base64_to_pil, pil_canny_edge
+from utils.images import (
+    pil_to_base64,
+    base64_to_pil,
+    base64_to_rgb_array,
+    pil_canny_edge,
+)
 
 
 class TestPilToBase64:
@@ -84,6 +89,36 @@ class TestBase64ToPil:
         assert original.mode == restored.mode
 
 
+class TestBase64ToRgbArray:
+    """base64_to_rgb_array 함수 테스트"""
+
+    def test_matches_pil_decode(self):
+        """PIL 디코딩 결과와 동일한 RGB 배열 반환 (RGBA/팔레트 포함)"""
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        arr = rng.integers(0, 256, (64, 48, 3), dtype=np.uint8)
+        for img in (
+            Image.fromarray(arr),
+            Image.fromarray(arr).convert("RGBA"),
+            Image.fromarray(arr).quantize(32),
+        ):
+            b64 = pil_to_base64(img)
+            expected = np.asarray(
+                Image.open(io.BytesIO(base64.b64decode(b64))).convert("RGB")
+            )
+            result = base64_to_rgb_array(b64)
+
+            assert result.dtype == np.uint8
+            assert result.shape == (64, 48, 3)
+            assert np.array_equal(result, expected)
+
+    def test_raises_on_non_image_bytes(self):
+        """이미지가 아닌 데이터 입력 시 ValueError 발생"""
+        with pytest.raises(ValueError):
+            base64_to_rgb_array(base64.b64encode(b"x" * 200).decode())
+
+
 class TestPilCannyEdge:
     """pil_canny_edge 함수 테스트"""
 
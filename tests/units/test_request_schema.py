@@ -0,0 +1,63 @@
+"""
+요청 스키마 단위 테스트.
+
+GenerateRequest의 읽기 전용(frozen) 설정과 Base64 이미지 필드 길이 제한을 검증합니다.
+"""
+
+import pytest
+from pydantic import ValidationError
+
+import sys
+from pathlib import Path
+
+# src/nanoCocoa_aiserver를 path에 추가
+sys.path.insert(0, str(Path(__file__).parents[2] / "src" / "nanoCocoa_aiserver"))
+
+from schemas import GenerateRequest
+from schemas.request import MAX_IMAGE_B64_LENGTH
+
+
+IMAGE_FIELDS = ("product_image", "step1_image", "step2_image")
+
+
+class TestGenerateRequestFrozen:
+    """생성 후 필드 변경 불가 검증"""
+
+    def test_rejects_field_assignment(self):
+        """필드 할당 시 ValidationError 발생"""
+        req = GenerateRequest(text_content="SALE")
+
+        with pytest.raises(ValidationError):
+            req.text_content = "changed"
+
+        assert req.text_content == "SALE"
+
+    def test_model_copy_update_still_allowed(self):
+        """변경이 필요하면 model_copy(update=...)로 새 인스턴스 생성"""
+        req = GenerateRequest(text_content="SALE")
+
+        updated = req.model_copy(update={"text_content": "NEW"})
+
+        assert updated.text_content == "NEW"
+        assert req.text_content == "SALE"
+
+
+class TestImageFieldMaxLength:
+    """Base64 이미지 필드 최대 길이 검증"""
+
+    @pytest.mark.parametrize("field", IMAGE_FIELDS)
+    def test_accepts_image_at_limit(self, field):
+        """최대 길이와 같은 문자열은 허용"""
+        req = GenerateRequest(**{field: "A" * MAX_IMAGE_B64_LENGTH})
+
+        assert len(getattr(req, field)) == MAX_IMAGE_B64_LENGTH
+
+    @pytest.mark.parametrize("field", IMAGE_FIELDS)
+    def test_rejects_oversized_image(self, field):
+        """최대 길이를 넘는 문자열은 거부 (API에서는 422 응답)"""
+        with pytest.raises(ValidationError) as exc_info:
+            GenerateRequest(**{field: "A" * (MAX_IMAGE_B64_LENGTH + 1)})
+
+        errors = exc_info.value.errors()
+        assert errors[0]["loc"] == (field,)
+        assert errors[0]["type"] == "string_too_long"
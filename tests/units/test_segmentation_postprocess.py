@@ -0,0 +1,150 @@
+"""
+세그멘테이션 후처리 회귀 테스트 (CPU).
+
+LUT/in-place 모폴로지/in-place CLAHE/디바이스 리사이즈로 재작성한 후처리가
+기존 v5 구현(NumPy 마스킹, cv2 Lanczos 리사이즈, PIL GaussianBlur)과 같은 결과를 내는지
+합성 마스크로 검증합니다.
+"""
+
+import numpy as np
+import pytest
+from PIL import Image, ImageFilter
+
+import sys
+from pathlib import Path
+
+# src/nanoCocoa_aiserver를 path에 추가
+sys.path.insert(0, str(Path(__file__).parents[2] / "src" / "nanoCocoa_aiserver"))
+
+torch = pytest.importorskip("torch")
+cv2 = pytest.importorskip("cv2")
+
+from models.segmentation import (
+    CFG,
+    _mask_luts,
+    apply_clahe_rgb,
+    postprocess_mask_hybrid,
+)
+
+
+# -----------------------------------------------------------------------------
+# 기존 v5 구현 (비교 기준)
+# -----------------------------------------------------------------------------
+def _reference_clamp(mask: np.ndarray) -> np.ndarray:
+    mask = mask.copy()
+    mask[mask < int(CFG["ALPHA_LOW_CUT"])] = 0
+    mask[mask > int(CFG["ALPHA_HIGH_CUT"])] = 255
+    return mask
+
+
+def _reference_soften(mask: np.ndarray) -> np.ndarray:
+    mask = mask.copy()
+    lo, hi = CFG["MID_RANGE"]
+    mid = (mask > lo) & (mask < hi)
+    mask[mid] = np.clip(
+        mask[mid].astype(np.float32) * float(CFG["MID_SOFTEN_GAIN"]), 0, 255
+    ).astype(np.uint8)
+    return mask
+
+
+def _reference_postprocess(out: torch.Tensor, size_wh) -> Image.Image:
+    W, H = size_wh
+    mask = torch.sigmoid(out)[0, 0].detach().cpu().numpy()
+    mask = (mask * 255.0).astype(np.uint8)
+    mask = cv2.resize(mask, (W, H), interpolation=cv2.INTER_LANCZOS4)
+    mask = _reference_clamp(mask)
+
+    k_close = int(CFG["MORPH_CLOSE_KERNEL"])
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (k_close, k_close))
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+
+    mask = _reference_soften(mask)
+    mask_pil = Image.fromarray(mask).convert("L")
+    return mask_pil.filter(
+        ImageFilter.GaussianBlur(radius=float(CFG["FINAL_FEATHER_RADIUS"]))
+    )
+
+
+def _reference_clahe(img_pil: Image.Image) -> Image.Image:
+    lab = cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2LAB)
+    l, a, b = cv2.split(lab)
+    clahe = cv2.createCLAHE(
+        clipLimit=float(CFG["CLAHE_CLIP_LIMIT"]),
+        tileGridSize=tuple(CFG["CLAHE_TILE_GRID"]),
+    )
+    merged = cv2.merge((clahe.apply(l), a, b))
+    return Image.fromarray(cv2.cvtColor(merged, cv2.COLOR_LAB2RGB))
+
+
+def _synthetic_logits(size: int = 256) -> torch.Tensor:
+    """원형 객체 + 가는 구멍이 있는 (1, 1, H, W) 로짓 맵"""
+    yy, xx = np.mgrid[0:size, 0:size].astype(np.float32)
+    dist = np.sqrt((xx - size / 2) ** 2 + (yy - size * 0.47) ** 2)
+    logits = (size * 0.27 - dist) / 6.0
+    logits[100:110, 100:160] -= 8.0
+    return torch.from_numpy(logits)[None, None]
+
+
+# -----------------------------------------------------------------------------
+# 테스트
+# -----------------------------------------------------------------------------
+class TestMaskLuts:
+    """클램프/소프트닝 LUT가 기존 NumPy 마스킹과 비트 단위로 일치"""
+
+    def _luts(self):
+        lo, hi = CFG["MID_RANGE"]
+        return _mask_luts(
+            int(CFG["ALPHA_LOW_CUT"]),
+            int(CFG["ALPHA_HIGH_CUT"]),
+            int(lo),
+            int(hi),
+            float(CFG["MID_SOFTEN_GAIN"]),
+        )
+
+    def test_clamp_lut_matches_reference(self):
+        clamp_lut, _ = self._luts()
+        values = np.arange(256, dtype=np.uint8)
+
+        np.testing.assert_array_equal(
+            cv2.LUT(values, clamp_lut), _reference_clamp(values)
+        )
+
+    def test_soften_lut_matches_reference(self):
+        _, soften_lut = self._luts()
+        values = np.arange(256, dtype=np.uint8)
+
+        np.testing.assert_array_equal(
+            cv2.LUT(values, soften_lut), _reference_soften(values)
+        )
+
+
+class TestApplyClahe:
+    """in-place L 채널 CLAHE가 split/merge 구현과 일치"""
+
+    def test_matches_split_merge_reference(self):
+        rng = np.random.default_rng(0)
+        img = Image.fromarray(rng.integers(0, 256, (96, 128, 3), dtype=np.uint8))
+
+        np.testing.assert_array_equal(
+            np.asarray(apply_clahe_rgb(img)), np.asarray(_reference_clahe(img))
+        )
+
+
+class TestPostprocessMaskHybrid:
+    """디바이스 리사이즈/OpenCV 페더링 결과가 v5 결과와 사실상 동일"""
+
+    @pytest.mark.parametrize("size_wh", [(256, 256), (400, 300), (180, 200)])
+    def test_matches_v5_reference(self, size_wh):
+        logits = _synthetic_logits()
+
+        result = postprocess_mask_hybrid(logits, size_wh)
+        expected = _reference_postprocess(logits, size_wh)
+
+        assert result.mode == "L"
+        assert result.size == size_wh
+
+        a = np.asarray(result).astype(np.int16)
+        b = np.asarray(expected).astype(np.int16)
+        # 리사이즈 필터(bicubic antialias vs Lanczos4) 차이는 경계 픽셀에만 나타남
+        assert np.abs(a - b).mean() < 0.5
+        assert ((a > 127) == (b > 127)).mean() > 0.999
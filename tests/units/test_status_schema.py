@@ -0,0 +1,96 @@
+"""
+상태 조회 응답 스키마 단위 테스트.
+
+/status의 msgspec 직렬화 경로(schemas.structs)가 Pydantic StatusResponse와
+동일한 JSON을 만드는지 검증합니다. (필드 추가/변경 시 두 스키마가 어긋나면 실패)
+"""
+
+import json
+
+import pytest
+
+import sys
+from pathlib import Path
+
+# src/nanoCocoa_aiserver를 path에 추가
+sys.path.insert(0, str(Path(__file__).parents[2] / "src" / "nanoCocoa_aiserver"))
+
+pytest.importorskip("msgspec")
+
+from schemas import GPUMetric, StatusResponse, SystemMetrics
+from schemas import structs
+
+
+def _status_fields(**overrides):
+    """get_status가 조립하는 형태의 응답 필드"""
+    fields = {
+        "job_id": "550e8400-e29b-41d4-a716-446655440000",
+        "status": "running",
+        "progress_percent": 42,
+        "current_step": "step2_text",
+        "sub_step": "sdxl_text_generation",
+        "message": "텍스트 생성 중",
+        "elapsed_sec": 12.3,
+        "eta_seconds": -3,
+        "step_eta_seconds": 7,
+        "system_metrics": {
+            "cpu_percent": 12.5,
+            "ram_used_gb": 7.25,
+            "ram_total_gb": 31.1,
+            "ram_percent": 23.3,
+            "gpu_info": [
+                {
+                    "index": 0,
+                    "name": "NVIDIA L4",
+                    "gpu_util": 87,
+                    "vram_used_gb": 15.2,
+                    "vram_total_gb": 22.5,
+                    "vram_percent": 67.6,
+                }
+            ],
+        },
+        "parameters": {"text_content": "SALE", "seed": None, "strength": 0.6},
+        "step1_result": "iVBORw0KGgo=",
+        "step2_result": None,
+        "final_result": None,
+    }
+    fields.update(overrides)
+    return fields
+
+
+class TestStatusStructParity:
+    """msgspec Struct와 Pydantic 스키마 일치 검증"""
+
+    @pytest.mark.parametrize(
+        "struct_cls, model_cls",
+        [
+            ("GPUMetricStruct", GPUMetric),
+            ("SystemMetricsStruct", SystemMetrics),
+            ("StatusResponseStruct", StatusResponse),
+        ],
+    )
+    def test_field_names_and_order_match(self, struct_cls, model_cls):
+        """Struct 필드 이름/순서가 Pydantic 모델과 동일"""
+        struct = getattr(structs, struct_cls)
+
+        assert struct.__struct_fields__ == tuple(model_cls.model_fields)
+
+    @pytest.mark.parametrize(
+        "overrides",
+        [
+            {},
+            {"system_metrics": None},
+            {"sub_step": None, "eta_seconds": None, "parameters": {}},
+        ],
+    )
+    def test_encodes_same_json_as_pydantic(self, overrides):
+        """동일 입력에 대해 msgspec 경로와 Pydantic 경로의 JSON이 같음"""
+        fields = _status_fields(**overrides)
+
+        fast = structs.encode_json(structs.build_status_struct(fields))
+        reference = StatusResponse.model_validate(fields).model_dump_json()
+
+        # 키 순서까지 비교 (object_pairs_hook으로 순서 보존 리스트 사용)
+        assert json.loads(fast, object_pairs_hook=list) == json.loads(
+            reference, object_pairs_hook=list
+        )